@@ -4,8 +4,55 @@ import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from matplotlib.ticker import FuncFormatter
 import datetime as dt
+import functools
 import os
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+if njit is not None:
+
+    @njit(cache=True)
+    def _daily_cumulative_balance(idx, amounts, ndays):
+
+        """Sum amounts into day buckets and accumulate them in a single fused pass"""
+        out = np.zeros(ndays)
+        for i in range(idx.size):
+            out[idx[i]] += amounts[i]
+
+        total = 0.0
+        for j in range(ndays):
+            total += out[j]
+            out[j] = total
+
+        return out
+
+else:
+
+    def _daily_cumulative_balance(idx, amounts, ndays):
+
+        """Sum amounts into day buckets and accumulate them into a running balance"""
+        return np.cumsum(np.bincount(idx, weights=amounts, minlength=ndays))
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+def _cached_by_version(method):
+
+    """Reuse a helper's result until the transaction data changes"""
+    @functools.wraps(method)
+    def wrapper(self):
+        entry = self._cache.get(method.__name__)
+        if entry is None or entry[0] != self._version:
+            entry = (self._version, method(self))
+            self._cache[method.__name__] = entry
+        return entry[1]
+
+    return wrapper
+
 # ----------------------------------------------------------------------------------------------------------------------
 
 class PersonalFinanceDashboard:
@@ -14,45 +61,116 @@ class PersonalFinanceDashboard:
         self.transactions = None
         self.categories = ['Food', 'Transportation', 'Housing', 'Entertainment', 
                            'Utilities', 'Shopping', 'Health', 'Education', 'Income', 'Other']
-        self.data_file = 'finance_data.csv'
+        self.category_dtype = pd.CategoricalDtype(self.categories)
+        self.data_file = 'finance_data.parquet'
+        self.legacy_data_file = 'finance_data.csv'
+        self.pending_file = 'finance_data_pending.csv'
+        self._pending = []
+        self._month = None
+        self._balance_cache = None
+        self._version = 0
+        self._cache = {}
         self.load_data()
 
 # ----------------------------------------------------------------------------------------------------------------------
     
     def load_data(self):
 
-        """Load transaction data from CSV or create a new file if it doesn't exist"""
+        """Load transaction data from Parquet or create a new file if it doesn't exist"""
+        normalize = True
         if os.path.exists(self.data_file):
-            self.transactions = pd.read_csv(self.data_file, parse_dates=['Date'])
+            self.transactions = pd.read_parquet(self.data_file)
+            # Saved data is already correctly signed by add_transaction
+            normalize = False
+        elif os.path.exists(self.legacy_data_file):
+            # One-time migration from the old CSV storage, which could hold unsigned sample data
+            self.transactions = self._read_csv(self.legacy_data_file)
         else:
             # Create a new dataframe 
 
+            rng = np.random.default_rng()
             sample_dataset = {
 
-                'Date': [dt.datetime.now() - dt.timedelta(days=i) for i in range(30, 0, -1)],
-                'Amount': [np.random.randint(-100, 100) for _ in range(30)],
-                'Category': np.random.choice(self.categories, 30),
-                'Description': ['Sample Transaction ' + str(i) for i in range(1, 31)]
+                'Date': pd.date_range(end=pd.Timestamp.now() - pd.Timedelta(days=1), periods=30, freq='D'),
+                'Amount': rng.integers(-100, 100, 30),
+                'Category': rng.choice(self.categories, 30),
+                'Description': np.char.add('Sample Transaction ', np.arange(1, 31).astype(str))
 
             }
             self.transactions = pd.DataFrame(sample_dataset)
+
+        # Replay transactions that were added after the last save, unless that save already included them
+        merged = self.transactions.attrs.pop('merged_pending', None)
+        replay = os.path.exists(self.pending_file)
+        if replay and merged == self._pending_stamp():
+            os.remove(self.pending_file)
+            replay = False
+        if replay:
+            pending = self._read_csv(self.pending_file)
+            self.transactions = pd.concat([self.transactions, pending], ignore_index=True)
+        self._pending = []
+
+        self.transactions['Category'] = self.transactions['Category'].astype(self.category_dtype)
+        self.transactions['Amount'] = self.transactions['Amount'].astype(np.float64)
+
+        if normalize:
+            #positive values for income, negative values for expenses
+            amt = self.transactions['Amount'].to_numpy()
+            codes = self.transactions['Category'].cat.codes.to_numpy()
+            income_code = self.categories.index('Income')
+            self.transactions['Amount'] = np.where(codes == income_code, np.abs(amt), -np.abs(amt))
+        self._month = None
+        self._balance_cache = None
+        self._version += 1
+
+        if replay or not os.path.exists(self.data_file):
             self.save_data()
-        
-        #positive values for income
-        mask = self.transactions['Category'] == 'Income'
-        self.transactions.loc[mask, 'Amount'] = self.transactions.loc[mask, 'Amount'].abs()
-        
-        #negative values for expenses
-        mask = self.transactions['Category'] != 'Income'
-        self.transactions.loc[mask, 'Amount'] = -self.transactions.loc[mask, 'Amount'].abs()
 
 
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def _read_csv(self, path):
+
+        """Read transactions from CSV using Arrow's multithreaded parser"""
+        return pd.read_csv(
+            path,
+            engine='pyarrow',
+            usecols=['Date', 'Amount', 'Category', 'Description'],
+            parse_dates=['Date'],
+            dtype={'Amount': 'float64', 'Category': self.category_dtype, 'Description': 'string'}
+        )
+
 # ----------------------------------------------------------------------------------------------------------------------
     
     def save_data(self):
 
-        """Save transaction data to CSV"""
-        self.transactions.to_csv(self.data_file, index=False)
+        """Save transaction data to Parquet"""
+        self._flush()
+        
+        # Record which pending file is included so an interrupted save is not replayed twice
+        stamp = self._pending_stamp()
+        self.transactions.attrs['merged_pending'] = stamp
+        
+        # Write to a temporary file first so the data file is always complete
+        tmp_file = self.data_file + '.tmp'
+        self.transactions.to_parquet(tmp_file, compression='zstd', index=False)
+        os.replace(tmp_file, self.data_file)
+        self.transactions.attrs.pop('merged_pending')
+        
+        # Pending transactions are now part of the saved data
+        if stamp is not None:
+            os.remove(self.pending_file)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def _pending_stamp(self):
+
+        """Identify the current pending file by its size and modification time"""
+        if not os.path.exists(self.pending_file):
+            return None
+        
+        stat = os.stat(self.pending_file)
+        return f'{stat.st_size}:{stat.st_mtime_ns}'
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -70,92 +188,117 @@ class PersonalFinanceDashboard:
         elif category == 'Income' and amount < 0:
             amount = abs(amount)
         
+        # Buffer the transaction and append it to the pending file instead of rewriting the data file
+        self._pending.append((date, amount, category, description))
+        self._version += 1
+        
         new_transaction = pd.DataFrame({
             'Date': [date],
             'Amount': [amount],
             'Category': [category],
             'Description': [description]
         })
+        new_transaction.to_csv(self.pending_file, mode='a', header=not os.path.exists(self.pending_file), index=False)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def _flush(self):
+
+        """Merge buffered transactions into the dataset"""
+        if not self._pending:
+            return
+        
+        pending = pd.DataFrame(self._pending, columns=['Date', 'Amount', 'Category', 'Description'])
+        pending['Amount'] = pending['Amount'].astype(np.float64)
+        pending['Category'] = pending['Category'].astype(self.category_dtype)
         
-        self.transactions = pd.concat([self.transactions, new_transaction], ignore_index=True)
-        self.transactions = self.transactions.sort_values('Date', ascending=False)
-        self.save_data()
+        self.transactions = pd.concat([self.transactions, pending], ignore_index=True)
+        self._pending = []
+        self._month = None
+
+# ----------------------------------------------------------------------------------------------------------------------
 
+    def _months(self):
+
+        """Return the month of every transaction, computed once until the data changes"""
+        if self._month is None or len(self._month) != len(self.transactions):
+            self._month = pd.PeriodIndex(self.transactions['Date'].dt.to_period('M'), name='Month')
+        return self._month
 
 # ----------------------------------------------------------------------------------------------------------------------
     
+    @_cached_by_version
     def get_balance_over_time_history(self):
 
         """Calculate cumulative balance over time"""
-        
-        daily_sums = self.transactions.groupby(self.transactions['Date'].dt.date)['Amount'].sum()
-        
-        
-        date_range = pd.date_range(
-            start=self.transactions['Date'].min().date(),
-            end=self.transactions['Date'].max().date(),
-            freq='D'
-        )
-        
-        # Create a series with all dates and fill missing values with 0
-        daily_sums = daily_sums.reindex(date_range.date, fill_value=0)
-        
-  
-        cumulative_balance = daily_sums.cumsum()
+        self._flush()
+        
+        # Only transactions added since the last calculation need to be accumulated
+        rows, previous = self._balance_cache if self._balance_cache is not None else (0, None)
+        new = self.transactions.iloc[rows:]
+        if previous is not None and new.empty:
+            return previous
+        
+        # Bucket every transaction by its day offset from the first day of the history
+        d = new['Date'].values.astype('datetime64[D]')
+        d0, d1 = d.min(), d.max()
+        if previous is not None:
+            known = previous.index[[0, -1]].values.astype('datetime64[D]')
+            d0, d1 = min(d0, known[0]), max(d1, known[1])
+        idx = (d - d0).astype(np.int64)
+        ndays = int((d1 - d0).astype(np.int64)) + 1
+        dates = pd.date_range(d0, periods=ndays, freq='D')
+        
+        # Days without transactions get a zero sum
+        balance = _daily_cumulative_balance(idx, new['Amount'].to_numpy(np.float64), ndays)
+        
+        if previous is not None:
+            # Carry the earlier balance over the possibly extended date range
+            balance += previous.reindex(dates).ffill().fillna(0).to_numpy()
+        
+        cumulative_balance = pd.Series(balance, index=dates)
+        self._balance_cache = (len(self.transactions), cumulative_balance)
         
         return cumulative_balance
     
 
 # ----------------------------------------------------------------------------------------------------------------------
     
+    @_cached_by_version
     def get_monthly_spending_by_category(self):
 
         """Calculate monthly spending by category"""
-        # Create a copy with month-year information
+        self._flush()
+        amt = self.transactions['Amount'].to_numpy()
+        cat = pd.CategoricalIndex(self.transactions['Category'], name='Category')
+        month = self._months()
 
-        df = self.transactions.copy()
-        df['Month'] = df['Date'].dt.to_period('M')
-        
-        # Filter expenses only
-        expenses = df[df['Amount'] < 0].copy()
-        expenses['Amount'] = abs(expenses['Amount'])  # Convert to positive for display
+        # Filter expenses only, converted to positive for display
+        mask = amt < 0
+        expenses = pd.Series(-amt[mask])
         
         # Group by month and category
-        monthly_by_category = expenses.pivot_table(
-            index='Month', 
-            columns='Category', 
-            values='Amount', 
-            aggfunc='sum',
-            fill_value=0
-        )
+        monthly_by_category = expenses.groupby([month[mask], cat[mask]], observed=True).sum().unstack(fill_value=0)
         
         return monthly_by_category
     
 # ----------------------------------------------------------------------------------------------------------------------
     
+    @_cached_by_version
     def get_income_vs_expenses_chart(self):
 
         """Calculate monthly income vs expenses"""
-        # Create a copy with month-year information
-
-        df = self.transactions.copy()
-        df['Month'] = df['Date'].dt.to_period('M')
+        self._flush()
+        amt = self.transactions['Amount'].to_numpy()
+        month = self._months()
         
-        # Group expenses and income
-        expenses = df[df['Amount'] < 0].copy()
-        expenses['Amount'] = abs(expenses['Amount'])
-        income = df[df['Amount'] > 0]
-        
-        # Sum by month
-        monthly_expenses = expenses.groupby('Month')['Amount'].sum()
-        monthly_income = income.groupby('Month')['Amount'].sum()
-        
-        # Combine into a single dataframe
-
-        monthly_summary = pd.DataFrame({
-            'Income': monthly_income,
-            'Expenses': monthly_expenses
-        }).fillna(0)
+        # Sum income and expenses by month in a single pass
+        # Zero amounts are neither income nor expenses
+        nonzero = amt != 0
+        sign = np.where(amt[nonzero] > 0, 'Income', 'Expenses')
+        monthly_summary = pd.Series(np.abs(amt[nonzero])).groupby([month[nonzero], sign]).sum().unstack(fill_value=0.0)
+        monthly_summary = monthly_summary.reindex(columns=['Income', 'Expenses'], fill_value=0.0)
         
         monthly_summary['Savings'] = monthly_summary['Income'] - monthly_summary['Expenses']
         monthly_summary['Savings_Rate'] = (monthly_summary['Savings'] / monthly_summary['Income'] * 100).fillna(0)
@@ -167,18 +310,21 @@ class PersonalFinanceDashboard:
     def get_current_month_spending(self):
 
         """Get current month's spending by category"""
+        self._flush()
 
-        current_month = pd.Timestamp.now().to_period('M')
-        
-        # Create a copy with month-year information
-        df = self.transactions.copy()
-        df['Month'] = df['Date'].dt.to_period('M')
+        month_start = pd.Timestamp.now().normalize().replace(day=1)
+        month_end = month_start + pd.offsets.MonthBegin(1)
+        amt = self.transactions['Amount'].to_numpy()
+        d = self.transactions['Date'].to_numpy()
         
         # Filter expenses for current month
-        current_expenses = df[(df['Month'] == current_month) & (df['Amount'] < 0)].copy()
-        current_expenses['Amount'] = abs(current_expenses['Amount'])
+        mask = (d >= np.datetime64(month_start)) & (d < np.datetime64(month_end)) & (amt < 0)
+        current_expenses = pd.DataFrame({
+            'Category': self.transactions['Category'].array[mask],
+            'Amount': -amt[mask]
+        })
         
-        return current_expenses.groupby('Category')['Amount'].sum()
+        return current_expenses.groupby('Category', observed=True)['Amount'].sum()
     
 # ----------------------------------------------------------------------------------------------------------------------
     
@@ -208,11 +354,14 @@ class PersonalFinanceDashboard:
 
         ax1.plot(dates, balance_data.values, 'b-', linewidth=2)
 
-        ax1.fill_between(dates, balance_data.values, where=(balance_data.values > 0), 
-                         color='green', alpha=0.3)
+        # Split the balance into its positive and negative parts for shading
+        v = balance_data.values
+        pos = np.maximum(v, 0)
+        neg = np.minimum(v, 0)
+
+        ax1.fill_between(dates, 0, pos, color='green', alpha=0.3)
         
-        ax1.fill_between(dates, balance_data.values, where=(balance_data.values < 0), 
-                         color='red', alpha=0.3)
+        ax1.fill_between(dates, 0, neg, color='red', alpha=0.3)
         
         ax1.set_title('Balance Over Time')
 
@@ -250,7 +399,7 @@ class PersonalFinanceDashboard:
             
             # Format x-axis 
 
-            labels = [str(idx).replace('M', '-') for idx in monthly_cat_data.index]
+            labels = monthly_cat_data.index.strftime('%Y-%m').tolist()
             ax2.set_xticklabels(labels, rotation=45)
             
             # Format y-axis 
@@ -270,6 +419,9 @@ class PersonalFinanceDashboard:
 
             num_months = min(6, len(monthly_summary))
             monthly_summary = monthly_summary.iloc[-num_months:]
+
+            # Month labels shared by the income vs expenses and savings rate charts
+            month_labels = monthly_summary.index.strftime('%Y-%m').tolist()
             
             bar_width = 0.35
             index = np.arange(len(monthly_summary.index))
@@ -283,8 +435,7 @@ class PersonalFinanceDashboard:
             ax3.set_xticks(index)
             
             # Format x-axis 
-            labels = [str(idx).replace('M', '-') for idx in monthly_summary.index]
-            ax3.set_xticklabels(labels, rotation=45)
+            ax3.set_xticklabels(month_labels, rotation=45)
             
             ax3.legend()
             ax3.grid(True, linestyle='--', alpha=0.3, axis='y')
@@ -327,8 +478,7 @@ class PersonalFinanceDashboard:
             ax5.set_xticks(range(len(monthly_summary)))
             
             # Format x-axis 
-            labels = [str(idx).replace('M', '-') for idx in monthly_summary.index]
-            ax5.set_xticklabels(labels, rotation=45)
+            ax5.set_xticklabels(month_labels, rotation=45)
             
             ax5.grid(True, linestyle='--', alpha=0.7)
             
@@ -418,13 +568,17 @@ class PersonalFinanceDashboard:
                 pd.set_option('display.max_columns', None)
                 pd.set_option('display.width', None)
                 
+                self._flush()
                 num_transactions = min(10, len(self.transactions))
-                recent = self.transactions.head(num_transactions)
+                recent = self.transactions.nlargest(num_transactions, 'Date')
                 
             
-                display_df = recent.copy()
-                display_df['Date'] = display_df['Date'].dt.strftime('%Y-%m-%d')
-                display_df['Amount'] = display_df['Amount'].apply(lambda x: f"₹{x:,.2f}")
+                display_df = pd.DataFrame({
+                    'Date': recent['Date'].dt.strftime('%Y-%m-%d'),
+                    'Amount': '₹' + recent['Amount'].map('{:,.2f}'.format),
+                    'Category': recent['Category'],
+                    'Description': recent['Description']
+                })
                 
                 print(display_df.to_string(index=False))
             